@@ -0,0 +1,175 @@
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select as sql_select
+import jwt
+from cachetools import TTLCache
+import hashlib
+import time
+
+from app.core.config import settings
+from app.db.database import get_db_session
+from app.models.user import User
+
+class BearerTokenHeader(OAuth2PasswordBearer):
+    """
+    OAuth2PasswordBearer with an inline header parse (one prefix check and a slice).
+    Subclassing keeps the OAuth2 flow registered in OpenAPI, so the Swagger
+    Authorize modal still works.
+    """
+
+    async def __call__(self, request: Request) -> str:
+        authorization = request.headers.get("authorization")
+        if not authorization or authorization[:7].lower() != "bearer ":
+            raise self.make_not_authenticated_error()
+        return authorization[7:]
+
+#token URL for the Authorize modal
+oauth2_scheme = BearerTokenHeader(tokenUrl="/api/v1/login", scheme_name="OAuth2PasswordBearer") 
+
+TOKEN_CACHE_TTL_SECONDS = 30
+
+# Decode arguments are fixed for the process lifetime; build them once
+_JWT_DECODE_KW = {"key": settings.SECRET_KEY, "algorithms": (settings.ALGORITHM,)}
+
+# Tokens revoked before their exp (e.g. on logout): blake2b(token) -> exp. Deliberately
+# not a size-capped cache: evicting an entry early would make a revoked token valid
+# again. Entries are only dropped once their exp has passed, after which jwt.decode
+# rejects the token anyway.
+_revoked_tokens: dict = {}
+
+def _token_hash(token: str) -> bytes:
+    # Hash instead of storing raw tokens in memory
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def _is_revoked(token_hash: bytes) -> bool:
+    exp = _revoked_tokens.get(token_hash)
+    return exp is not None and exp > time.time()
+
+def invalidate_token(token: str) -> None:
+    """
+    Revokes a token before it expires (e.g. on logout).
+    """
+    token_hash = _token_hash(token)
+    get_current_user.forget(token_hash)
+
+    try:
+        exp = jwt.decode(token, **_JWT_DECODE_KW)["exp"]
+    except (jwt.PyJWTError, KeyError):
+        # Can't read the exp; hold it for a full token lifetime instead
+        exp = time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    now = time.time()
+    for expired in [h for h, e in _revoked_tokens.items() if e <= now]:
+        del _revoked_tokens[expired]
+    _revoked_tokens[token_hash] = exp
+
+def _decode_token(token: str, credentials_exception: HTTPException) -> dict:
+    try:
+        payload = jwt.decode(token, **_JWT_DECODE_KW)
+    except jwt.PyJWTError:
+        raise credentials_exception
+
+    if payload.get("sub") is None or payload.get("exp") is None:
+        raise credentials_exception
+    return payload
+
+# AUTHENTICATION DEPENDENCIES
+class CurrentUser:
+    """
+    Dependency that authenticates the user based on the JWT token.
+    The user is rebuilt from the token claims (no DB query), so it reflects the
+    account state at login time. Use get_current_user_from_db when fresh state matters.
+
+    Decoded tokens are cached per instance: blake2b(token) -> (user, exp), so repeat
+    requests with the same bearer token skip jwt.decode. Entries never outlive the
+    token's own exp. Within one request, FastAPI's dependency cache (keyed on this
+    callable) already shares the result between every dependency that asks for it,
+    so the single module-level instance below must be used everywhere.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: int = TOKEN_CACHE_TTL_SECONDS):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def forget(self, token_hash: bytes) -> None:
+        self._cache.pop(token_hash, None)
+
+    async def __call__(self, token: str = Depends(oauth2_scheme)) -> User:
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        inactive_exception = HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, 
+            detail="Inactive user"
+        )
+
+        token_hash = _token_hash(token)
+        # Checked before the cache so a revocation wins even over a cached entry
+        if _is_revoked(token_hash):
+            raise credentials_exception
+
+        cached = self._cache.get(token_hash)
+        if cached is not None:
+            user, exp = cached
+            if exp > time.time():
+                if not user.is_active:
+                    raise inactive_exception
+                return user
+            # Token expired before the cache entry did
+            self._cache.pop(token_hash, None)
+
+        payload = _decode_token(token, credentials_exception)
+
+        try:
+            # Detached instance, never added to a session
+            user = User(
+                id=int(payload["sub"]),
+                email=payload["email"],
+                is_active=payload["act"],
+            )
+        except (KeyError, ValueError):
+            # Tokens issued before the claims were added
+            raise credentials_exception
+
+        if not user.is_active:
+            raise inactive_exception
+
+        self._cache[token_hash] = (user, payload["exp"])
+        return user
+
+get_current_user = CurrentUser()
+
+async def get_current_user_from_db(
+    db: AsyncSession = Depends(get_db_session), 
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Like get_current_user, but loads the user row so deactivations take effect immediately.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    if _is_revoked(_token_hash(token)):
+        raise credentials_exception
+
+    payload = _decode_token(token, credentials_exception)
+
+    user = await db.scalar(
+        sql_select(User).where(User.id == int(payload["sub"]))
+    )
+    
+    if user is None:
+        raise credentials_exception
+        
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, 
+            detail="Inactive user"
+        )
+        
+    return user
@@ -1,98 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from sqlalchemy import delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.database import get_db_session
-from app.schemas.user import UserCreate, Token, UserPublic 
-from app.core.security import get_password_hash, verify_password, create_access_token
-from datetime import timedelta
+from sqlalchemy.orm import undefer
+from app.db.database import get_db_session, AsyncSessionLocal
+from app.schemas.user import UserCreate, Token, UserPublic, normalize_email
+from app.core.security import get_password_hash, verify_password, password_needs_rehash, create_access_token
+from datetime import datetime, timedelta
 from app.core.config import settings
 from sqlalchemy.future import select as sql_select
-from typing import List
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm 
-from jose import jwt, JWTError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import List, Optional
+from fastapi.security import OAuth2PasswordRequestForm 
+from app.api.deps import get_current_user
 
 #Model Imports
 from app.models.user import User
 from app.models.content import Content, Sentiment
-from app.schemas.content import ContentCreate, ContentAnalysisResults
-from app.services.llm_service import analyze_content 
+from app.schemas.content import ContentCreate, ContentBulkCreate, ContentAnalysisResults, ContentSummary
+from app.services.llm_service import analyze_content, analyze_many
 
 router = APIRouter()
-#token URL for the Authorize modal
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login") 
 
-# AUTHENTICATION DEPENDENCY
-async def get_current_user(
-    db: AsyncSession = Depends(get_db_session), 
-    token: str = Depends(oauth2_scheme)
-) -> User:
+def _insert_user_ignoring_duplicates(dialect_name: str, values: dict):
     """
-    Dependency that authenticates the user based on the JWT token.
+    Builds an INSERT into users that is a no-op (rowcount == 0) when the email exists.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        
-    except JWTError:
-        raise credentials_exception
+    if dialect_name == "mysql":
+        # INSERT IGNORE rather than ON DUPLICATE KEY UPDATE: the MySQL drivers run with
+        # CLIENT_FOUND_ROWS, which reports a no-op update as 1 row and hides the duplicate.
+        return mysql_insert(User.__table__).values(**values).prefix_with("IGNORE")
+    insert = pg_insert if dialect_name == "postgresql" else sqlite_insert
+    return insert(User.__table__).values(**values).on_conflict_do_nothing(index_elements=["email"])
 
-    user = await db.scalar(
-        sql_select(User).where(User.id == int(user_id))
-    )
-    
-    if user is None:
-        raise credentials_exception
-        
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, 
-            detail="Inactive user"
-        )
-        
-    return user
-    
 # --- 1. /signup Endpoint (Unprotected) ---
 @router.post("/signup", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_data: UserCreate, 
     db: AsyncSession = Depends(get_db_session)
 ):
-    # Check if user already exists
-    user_exists = await db.scalar(
-        sql_select(User).where(User.email == user_data.email)
-    )
-    if user_exists:
+    # Hash the password (Argon2id, in a worker thread)
+    hashed_password = await get_password_hash(user_data.password)
+
+    values = {
+        "email": user_data.email,
+        "hashed_password": hashed_password,
+        "is_active": True,
+        "created_at": datetime.utcnow(),
+    }
+
+    # Single INSERT that skips an existing email instead of SELECT-then-INSERT
+    # (one round-trip, and no race between the check and the write)
+    stmt = _insert_user_ignoring_duplicates(db.get_bind().dialect.name, values)
+    result = await db.execute(stmt)
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered."
         )
+    await db.commit()
 
-    # Hash the password (using safe SHA256)
-    hashed_password = get_password_hash(user_data.password)
-
-    # Create new user model instance
-    new_user = User(
-        email=user_data.email, 
-        hashed_password=hashed_password
+    # Built from the values we just inserted (hashed_password is deliberately left out)
+    return UserPublic.model_construct(
+        id=result.inserted_primary_key[0],
+        email=values["email"],
+        is_active=values["is_active"],
+        created_at=values["created_at"],
     )
 
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
-    
-    return new_user
-
 # --- 2. /login Endpoint (CRITICAL FIX: Uses form data for Authorization Modal) ---
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
@@ -101,21 +77,26 @@ async def login_for_access_token(
 ):
     # Retrieve user by email (OAuth2PasswordRequestForm uses 'username' field for email)
     user = await db.scalar(
-        sql_select(User).where(User.email == form_data.username)
+        sql_select(User).where(User.email == normalize_email(form_data.username))
     )
 
     # Check if user exists and password is correct
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Upgrade legacy sha256_crypt (or outdated Argon2) hashes now that we have the plain password
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash(form_data.password)
+        await db.commit()
     
     # Create the JWT access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, 
+        data={"sub": str(user.id), "email": user.email, "act": user.is_active}, 
         expires_delta=access_token_expires
     )
     
@@ -123,14 +104,34 @@ async def login_for_access_token(
     return {"access_token": access_token, "token_type": "bearer"}
 
 # --- 3. POST /contents Endpoint (Create & AI Process) ---
+async def _run_analysis_and_persist(content_id: int, owner_id: int, raw_text: str) -> None:
+    """
+    Background job: runs the LLM analysis and writes the results onto the content row.
+    Uses its own session because the request's session is closed by the time this runs.
+    """
+    summary, sentiment = await analyze_content(raw_text, owner_id)
+
+    if summary is None and sentiment is None:
+        return
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(Content)
+            .where(Content.id == content_id)
+            .values(summary=summary, sentiment=sentiment)
+        )
+        await db.commit()
+
 @router.post("/contents", response_model=ContentAnalysisResults, status_code=status.HTTP_202_ACCEPTED)
 async def create_content(
     content_data: ContentCreate,
+    background: BackgroundTasks,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_user) # Protected endpoint
 ):
     """
-    Uploads content, saves it to the database, and triggers asynchronous AI processing.
+    Uploads content, saves it to the database, and schedules AI processing in the background.
+    The response is returned immediately; summary and sentiment are filled in once analysis finishes.
     """
     
     new_content = Content(
@@ -139,34 +140,103 @@ async def create_content(
     )
     db.add(new_content)
     await db.commit()
-    await db.refresh(new_content)
 
-    summary, sentiment = await analyze_content(new_content.raw_content)
+    background.add_task(_run_analysis_and_persist, new_content.id, current_user.id, new_content.raw_content)
 
-    if summary is not None or sentiment is not None:
-        new_content.summary = summary
-        new_content.sentiment = sentiment.value if sentiment else None 
-        
+    return new_content
+
+async def _run_bulk_analysis_and_persist(owner_id: int, items: List[tuple]) -> None:
+    """
+    Background job for bulk uploads: analyzes all items concurrently, then writes every
+    result back in a single executemany UPDATE.
+    """
+    results = await analyze_many([raw_text for _, raw_text in items], owner_id)
+    rows = [
+        {"id": content_id, "summary": summary, "sentiment": sentiment}
+        for (content_id, _), (summary, sentiment) in zip(items, results)
+        if summary is not None or sentiment is not None
+    ]
+    if not rows:
+        return
+
+    async with AsyncSessionLocal() as db:
+        # ORM bulk UPDATE by primary key. The extra WHERE scopes the write to the owner and
+        # turns off the matched-row check, so items deleted while the analysis ran are
+        # simply skipped instead of failing the whole write-back with StaleDataError.
+        await db.execute(
+            update(Content).where(Content.owner_id == owner_id),
+            rows,
+            execution_options={"synchronize_session": None},
+        )
         await db.commit()
-        await db.refresh(new_content)
 
-    return new_content
+@router.post("/contents/bulk", response_model=List[ContentAnalysisResults], status_code=status.HTTP_202_ACCEPTED)
+async def create_contents_bulk(
+    bulk_data: ContentBulkCreate,
+    background: BackgroundTasks,
+    db: AsyncSession = Depends(get_db_session),
+    current_user: User = Depends(get_current_user) # Protected endpoint
+):
+    """
+    Uploads several pieces of content at once and analyzes them concurrently in the background.
+    """
+    new_contents = [
+        Content(raw_content=item.raw_content, owner_id=current_user.id)
+        for item in bulk_data.items
+    ]
+    db.add_all(new_contents)
+    await db.commit()
 
-# --- 4. GET /contents Endpoint (Retrieve All) ---
-@router.get("/contents", response_model=List[ContentAnalysisResults])
+    background.add_task(
+        _run_bulk_analysis_and_persist,
+        current_user.id,
+        [(content.id, content.raw_content) for content in new_contents],
+    )
+
+    return new_contents
+
+# --- 4. GET /contents Endpoint (Retrieve All, paginated) ---
+@router.get("/contents", response_model=List[ContentSummary])
 async def read_contents(
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of items to return."),
+    after_id: Optional[int] = Query(None, description="Return items older than this id (the last id of the previous page)."),
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_user) # Protected endpoint
 ):
     """
-    Retrieves all content submitted by the authenticated user.
+    Retrieves content submitted by the authenticated user, newest first.
+    Uses keyset pagination: pass the last id of a page as `after_id` to get the next one.
     """
-    result = await db.execute(
-        sql_select(Content)
+    # Only the columns the list schema needs; raw_content can be large and is left out
+    stmt = (
+        sql_select(
+            Content.id,
+            Content.owner_id,
+            Content.created_at,
+            Content.summary,
+            Content.sentiment,
+        )
         .where(Content.owner_id == current_user.id)
+        .order_by(Content.id.desc())
+        .limit(limit)
     )
-    contents = result.scalars().all()
-    return contents
+    if after_id is not None:
+        stmt = stmt.where(Content.id < after_id)
+
+    result = await db.execute(stmt)
+
+    # Rows come from our own schema, so build the models without per-row validation.
+    # Pydantic accepts ready-made instances as-is when FastAPI checks the response_model.
+    return [
+        ContentSummary.model_construct(
+            id=row.id,
+            owner_id=row.owner_id,
+            created_at=row.created_at,
+            summary=row.summary,
+            sentiment=Sentiment(row.sentiment) if row.sentiment else None,
+        )
+        for row in result
+    ]
 
 # --- 5. GET /contents/{id} Endpoint (Retrieve Specific) ---
 @router.get("/contents/{content_id}", response_model=ContentAnalysisResults)
@@ -178,13 +248,11 @@ async def read_content_by_id(
     """
     Retrieves a specific piece of content by ID, ensuring ownership.
     """
-    content = await db.scalar(
-        sql_select(Content)
-        .where(Content.id == content_id)
-        .where(Content.owner_id == current_user.id)
-    )
+    # Primary-key lookup through the session identity map; ownership is checked in Python.
+    # raw_content is deferred on the model, so load it in the same SELECT here.
+    content = await db.get(Content, content_id, options=[undefer(Content.raw_content)])
     
-    if content is None:
+    if content is None or content.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Content not found or you do not own this content"
@@ -201,19 +269,19 @@ async def delete_content(
     """
     Deletes a specific piece of content by ID, ensuring ownership.
     """
-    content_to_delete = await db.scalar(
-        sql_select(Content)
+    # Single ownership-checked DELETE; rowcount tells us whether anything matched
+    result = await db.execute(
+        delete(Content)
         .where(Content.id == content_id)
         .where(Content.owner_id == current_user.id)
     )
     
-    if content_to_delete is None:
+    if result.rowcount == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Content not found or you do not own this content"
         )
 
-    await db.delete(content_to_delete)
     await db.commit()
     return
 
@@ -1,12 +1,15 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-import os
+from functools import lru_cache
 from dotenv import load_dotenv
 load_dotenv()
 
 class Settings(BaseSettings):
     # Database Settings
     DATABASE_URL: str = Field(..., description="MySQL database connection string.")
+    DB_ECHO: bool = Field(False, description="Log every SQL statement (debugging only).")
+    DB_POOL_SIZE: int = Field(20, description="Persistent connections kept in the pool.")
+    DB_MAX_OVERFLOW: int = Field(10, description="Extra connections allowed above DB_POOL_SIZE under burst load.")
 
     # Security Settings (JWT)
     SECRET_KEY: str = Field(..., description="Secret key for JWT generation.")
@@ -15,6 +18,22 @@ class Settings(BaseSettings):
 
     # --- LLM Settings (Updated for Gemini) ---
     GEMINI_API_KEY: str = Field(..., description="API key for the Gemini service.") 
+    LLM_MIN_CHARS: int = Field(20, description="Shorter inputs are returned as their own summary with Neutral sentiment, without calling Gemini.")
+    LLM_MAX_CHARS: int = Field(20000, description="Inputs are truncated to this many characters before analysis.")
+    LLM_CACHE_MAX_ENTRIES: int = Field(10000, description="Analyses kept in the in-process result cache.")
+    LLM_CACHE_TTL_SECONDS: int = Field(86400, description="How long a cached analysis is reused before Gemini is asked again.")
+    LLM_BATCH_MAX: int = Field(8, description="Most texts coalesced into a single Gemini call (1 disables batching).")
+    LLM_BATCH_WAIT_MS: int = Field(20, description="How long the first queued text waits for others to join its batch.")
+    LLM_MAX_CONCURRENCY: int = Field(16, description="Most Gemini requests in flight at once per worker.")
+    LLM_RETRY_ATTEMPTS: int = Field(4, description="Total tries for a Gemini call that hits a 429/5xx or a timeout.")
+    LLM_BREAKER_FAIL_MAX: int = Field(5, description="Consecutive failed Gemini calls that open the circuit breaker.")
+    LLM_BREAKER_RESET_SECONDS: int = Field(30, description="How long the open breaker fails fast before letting a trial call through.")
+    LLM_HTTP2: bool = Field(True, description="Multiplex concurrent Gemini calls over one HTTP/2 connection (False falls back to HTTP/1.1 keep-alive).")
+
+@lru_cache
+def get_settings() -> Settings:
+    """Returns the process-wide Settings, reading the environment only once."""
+    return Settings()
 
 # Instantiate settings object
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
\ No newline at end of file
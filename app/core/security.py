@@ -1,28 +1,63 @@
-from passlib.context import CryptContext
+import asyncio
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from passlib.hash import sha256_crypt
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import jwt, JWTError
+import jwt
 from app.core.config import settings
 
 # --- Password Hashing Setup ---
 
-# CRITICAL FIX: Use the native SHA256 hash, which has no external C-library dependency
-# and no 72-byte limit issues, eliminating the source of the crash.
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto") 
+# Argon2id via argon2-cffi: the KDF runs in C and releases the GIL, so calls are
+# pushed to a worker thread to keep the event loop free during /signup and /login.
+_ph = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# Accounts created before the switch to Argon2 hold sha256_crypt ("$5$...") hashes. They
+# are still accepted (verify only) and get re-hashed with Argon2 on their next login.
+_LEGACY_HASH_PREFIX = "$5$"
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    if hashed_password.startswith(_LEGACY_HASH_PREFIX):
+        try:
+            return sha256_crypt.verify(plain_password, hashed_password)
+        except ValueError:
+            # Malformed legacy hash
+            return False
+    try:
+        return _ph.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        # Covers wrong passwords and hashes not produced by Argon2
+        return False
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    True for legacy sha256_crypt hashes and for Argon2 hashes made with older parameters.
+    Only meaningful after the password has been verified.
+    """
+    if hashed_password.startswith(_LEGACY_HASH_PREFIX):
+        return True
+    try:
+        return _ph.check_needs_rehash(hashed_password)
+    except InvalidHashError:
+        return False
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies a plain password against a hashed one."""
-    # This function handles the SHA256 verification
-    return pwd_context.verify(plain_password, hashed_password)
+    return await asyncio.to_thread(_verify, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """
-    Hashes a password for storage using SHA256 (no external dependencies needed).
+    Hashes a password for storage using Argon2id (off the event loop).
     """
-    return pwd_context.hash(password)
+    return await asyncio.to_thread(_ph.hash, password)
 
 # --- JWT Token Management---
 
+_JWT_ENCODE_KEY = settings.SECRET_KEY
+_JWT_ENCODE_ALG = settings.ALGORITHM
+_DEFAULT_TOKEN_LIFETIME = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Creates a new JWT access token."""
     to_encode = data.copy()
@@ -30,13 +65,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.utcnow() + _DEFAULT_TOKEN_LIFETIME
     
     to_encode.update({"exp": expire})
     
     encoded_jwt = jwt.encode(
         to_encode, 
-        settings.SECRET_KEY, 
-        algorithm=settings.ALGORITHM
+        _JWT_ENCODE_KEY, 
+        algorithm=_JWT_ENCODE_ALG
     )
     return encoded_jwt
\ No newline at end of file
@@ -1,5 +1,3 @@
-from app.core.config import Settings
-
-#in-memory SQLite URL for testing purposes
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
-
+#in-memory SQLite URL for testing purposes. A named database with a shared cache lives
+# entirely in RAM, and every connection in the test process sees the same schema and rows.
+TEST_DATABASE_URL = "sqlite+aiosqlite:///file:testdb?mode=memory&cache=shared&uri=true"
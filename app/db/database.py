@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.engine import make_url
 from app.core.config import settings
 from typing import AsyncGenerator
 
@@ -8,10 +9,22 @@ class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 # 2. Database Engine Setup
-# create_async_engine uses the URL from settings (e.g., mysql+aiomysql://...)
+# create_async_engine uses the URL from settings (e.g., mysql+asyncmy://...)
+# Pool sizing only applies to server databases; SQLite (used in CI) manages its own pool.
+pool_options = {}
+if make_url(settings.DATABASE_URL).get_backend_name() != "sqlite":
+    pool_options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": True,   # Drop connections MySQL closed while idle
+        "pool_recycle": 1800,    # Stay under MySQL's wait_timeout
+        "pool_use_lifo": True,   # Keep a hot subset warm so idle extras can be reaped
+    }
+
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=True 
+    echo=settings.DB_ECHO,
+    **pool_options
 )
 
 # 3. Asynchronous Session Maker
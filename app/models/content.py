@@ -2,16 +2,15 @@ from __future__ import annotations
 
 import datetime
 import enum
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 from sqlalchemy import (
     String,
     Integer,
     DateTime,
-    func,
     Text,
     ForeignKey,
-    Enum,
+    Index,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -22,8 +21,10 @@ if TYPE_CHECKING:
     from app.models.user import User
 
 
-# Define the sentiment choices as an Enum
-class Sentiment(enum.Enum):
+# Define the sentiment choices as an Enum.
+# A StrEnum member *is* its value (str(member) == "Positive"), so it can be written
+# to the plain string column as-is, with no conversion at the ORM/driver boundary.
+class Sentiment(enum.StrEnum):
     POSITIVE = "Positive"
     NEGATIVE = "Negative"
     NEUTRAL = "Neutral"
@@ -31,17 +32,26 @@ class Sentiment(enum.Enum):
 
 class Content(Base):
     __tablename__ = "contents"
+    # Every content endpoint filters on owner_id (list) or (id, owner_id) (get/delete)
+    __table_args__ = (
+        Index("ix_contents_owner_id_id", "owner_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
-    raw_content: Mapped[str] = mapped_column(Text)
+    # Potentially large, so deferred: ORM selects skip it unless a query asks for it (undefer)
+    raw_content: Mapped[str] = mapped_column(Text, deferred=True)
 
     # LLM Generated Fields
     summary: Mapped[str] = mapped_column(Text, nullable=True)
-    sentiment: Mapped[Sentiment] = mapped_column(Enum(Sentiment), nullable=True)
+    # Stored as the plain Sentiment value ("Positive", ...); validated by the Pydantic schemas.
+    # Sized to the longest value ("Negative"/"Positive" = 8 chars) to keep rows narrow.
+    sentiment: Mapped[Optional[str]] = mapped_column(String(8), nullable=True)
 
     # Metadata
-    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=func.now())
+    # Set in Python (UTC, like users.created_at) so the value is known right after the INSERT
+    # without a server round-trip, on backends with or without RETURNING
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.utcnow)
 
     # Relationship to User (Foreign Key)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
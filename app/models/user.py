@@ -4,6 +4,7 @@ import datetime
 from typing import List, TYPE_CHECKING
 
 from sqlalchemy import String, Integer, DateTime, func, Boolean
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.database import Base
@@ -17,7 +18,15 @@ class User(Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    # Emails are lowercased before they reach the DB, so MySQL can compare them
+    # byte-wise (utf8mb4_bin) instead of with case-insensitive Unicode folding.
+    email: Mapped[str] = mapped_column(
+        String(320).with_variant(
+            mysql.VARCHAR(320, charset="utf8mb4", collation="utf8mb4_bin"), "mysql"
+        ),
+        unique=True,
+        index=True,
+    )
     hashed_password: Mapped[str] = mapped_column(String(255))
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=func.now())
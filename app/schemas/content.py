@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from app.models.content import Sentiment # Import the Enum from the models file
 import datetime
 
@@ -9,20 +9,27 @@ class ContentCreate(BaseModel):
     """Schema for input when a user uploads content."""
     raw_content: str = Field(..., description="The main text body to be summarized and analyzed.")
 
+class ContentBulkCreate(BaseModel):
+    """Schema for uploading several pieces of content in one request."""
+    items: List[ContentCreate] = Field(..., min_length=1, max_length=100, description="The content items to upload (1-100).")
+
 # --- Output Schemas ---
 
 class ContentBase(BaseModel):
     """Base schema for content data."""
+    # Response-only, shared by every content view below: built from Content rows and never mutated
+    model_config = ConfigDict(from_attributes=True, extra="forbid", frozen=True)
+
     id: int
-    raw_content: str
     owner_id: int
     created_at: datetime.datetime
 
-    class Config:
-        from_attributes = True
-
-class ContentAnalysisResults(ContentBase):
-    """Schema for content including the LLM analysis results."""
+class ContentSummary(ContentBase):
+    """Schema for content in list responses: the analysis results without the (potentially large) raw text."""
     # Note: These fields are optional because they are NULL initially, before the LLM processes them.
     summary: Optional[str] = None
-    sentiment: Optional[Sentiment] = None
\ No newline at end of file
+    sentiment: Optional[Sentiment] = None
+
+class ContentAnalysisResults(ContentSummary):
+    """Schema for content including the raw text and the LLM analysis results."""
+    raw_content: str
\ No newline at end of file
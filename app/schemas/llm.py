@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from app.models.content import Sentiment
+
+# Upper-cased enum names and values ('POSITIVE', ...) -> Sentiment, built once at import
+SENTIMENT_BY_LABEL = {m.name: m for m in Sentiment} | {m.value.upper(): m for m in Sentiment}
+
+# --- Gemini Structured Output ---
+
+class GeminiAnalysis(BaseModel):
+    """The JSON object Gemini returns for our responseSchema: a summary and a sentiment label."""
+    summary: str = Field(..., min_length=1)
+    sentiment: Sentiment
+
+    @field_validator("sentiment", mode="before")
+    @classmethod
+    def sentiment_from_label(cls, value):
+        # Gemini answers with labels like 'POSITIVE'; match them to the enum case-insensitively.
+        # Unknown labels fall through unchanged and fail enum validation.
+        if isinstance(value, str):
+            return SENTIMENT_BY_LABEL.get(value.strip().upper(), value)
+        return value
+
+class GeminiBatchAnalysis(GeminiAnalysis):
+    """One element of a batched answer; `index` echoes the input item it belongs to."""
+    index: int
+
+# --- Gemini generateContent Envelope ---
+# Only the path we read (candidates[0].content.parts[0].text) is modelled; other keys are ignored.
+
+class GeminiPart(BaseModel):
+    text: Optional[str] = None
+
+class GeminiContent(BaseModel):
+    parts: List[GeminiPart] = []
+
+class GeminiCandidate(BaseModel):
+    content: Optional[GeminiContent] = None
+
+class GeminiResponse(BaseModel):
+    candidates: List[GeminiCandidate] = []
+
+    def first_text(self) -> Optional[str]:
+        """Returns the text of the first part of the first candidate, if there is one."""
+        if not self.candidates or self.candidates[0].content is None:
+            return None
+        parts = self.candidates[0].content.parts
+        return parts[0].text if parts else None
@@ -1,7 +1,11 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
 from typing import Optional
 import datetime
 
+def normalize_email(email: str) -> str:
+    """Canonical form used for storage and lookups (emails are matched case-sensitively in the DB)."""
+    return email.strip().lower()
+
 # --- Input Schemas (Used for POST /signup and POST /login body) ---
 
 class UserCreate(BaseModel):
@@ -9,6 +13,11 @@ class UserCreate(BaseModel):
     email: EmailStr
     password: str
 
+    @field_validator("email")
+    @classmethod
+    def lowercase_email(cls, value: str) -> str:
+        return normalize_email(value)
+
 # NOTE: We reuse UserCreate for UserLogin input, as they are identical fields.
 
 # --- Output Schemas (Used for API responses) ---
@@ -18,16 +27,18 @@ class UserPublic(BaseModel):
     Schema for public user data returned by the API (e.g., after signup).
     CRITICAL: Excludes sensitive fields like 'hashed_password'.
     """
+    # A dict carrying e.g. hashed_password fails validation instead of being quietly accepted
+    model_config = ConfigDict(from_attributes=True, extra="forbid", frozen=True)
+
     id: int
     email: EmailStr
     is_active: bool
     created_at: datetime.datetime
 
-    class Config:
-        from_attributes = True 
-
 class Token(BaseModel):
     """Schema for the returned JWT token."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     access_token: str
     token_type: str = "bearer"
 
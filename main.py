@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from app.api.v1 import router as api_router
 from app.db.database import create_db_and_tables 
+from app.core.etag import ETagMiddleware
+from app.services.llm_service import warm_up_client, close_client
 
 # This is CRITICAL: Import the models module *here* so SQLAlchemy knows they exist
 # before create_db_and_tables runs.
@@ -14,8 +16,11 @@ async def lifespan(app: FastAPI):
     print("Initializing database and creating tables...")
     await create_db_and_tables()
     print("Database initialization complete.")
+    # Open the shared Gemini HTTP client and its first connection before serving traffic
+    await warm_up_client()
     yield
-    # Shutdown: (No specific action needed for this project)
+    # Shutdown: release the pooled Gemini connections
+    await close_client()
 
 
 # 2. Initialize the FastAPI application with the lifespan
@@ -26,6 +31,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Conditional GETs: ETag on every 200 GET, 304 when If-None-Match matches
+app.add_middleware(ETagMiddleware)
+
 # Include the API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -1,11 +1,16 @@
 import pytest
 import pytest_asyncio
 import asyncio
+import json
 import sys
 import os
+import time
+import httpx
 from httpx import AsyncClient, ASGITransport
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # CRITICAL FIX: Inject the project root path to resolve ModuleNotFoundError
 sys.path.insert(0, os.path.abspath("."))
@@ -15,6 +20,16 @@ from main import app
 from app.db.database import Base, get_db_session
 from app.core.test_config import TEST_DATABASE_URL
 from app.models.user import User  # Used for type hinting
+from passlib.hash import sha256_crypt
+from sqlalchemy import select
+from app.models.content import Sentiment
+from app.schemas.llm import GeminiAnalysis, GeminiResponse
+import app.api.v1 as api_v1
+import app.api.deps as deps
+from app.core.security import create_access_token
+from datetime import timedelta
+from fastapi import HTTPException
+import app.services.llm_service as llm_service
 
 
 # --- 1. Database Setup for Testing ---
@@ -22,7 +37,9 @@ from app.models.user import User  # Used for type hinting
 test_engine = create_async_engine(
     TEST_DATABASE_URL,
     echo=False,
-    connect_args={"check_same_thread": False},
+    # One connection reused by every session, so the in-memory database outlives checkouts
+    poolclass=StaticPool,
+    connect_args={"check_same_thread": False, "uri": True},
 )
 
 TestingSessionLocal = sessionmaker(
@@ -45,7 +62,7 @@ app.dependency_overrides[get_db_session] = override_get_db_session
 # --- 2. Pytest Fixture for Test Client and Tables ---
 
 
-@pytest_asyncio.fixture(scope="session")
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def client() -> AsyncClient:
     """
     Async fixture to provide the Async Test Client and manage table setup/teardown.
@@ -64,7 +81,37 @@ async def client() -> AsyncClient:
         await conn.run_sync(Base.metadata.drop_all)
 
 
-# --- 3. Test Cases ---
+# --- 3. Helpers ---
+
+
+async def get_auth_headers(client: AsyncClient) -> dict:
+    login_data = {
+        "username": "testuser@pytest.com",
+        "password": "TestPassword123",
+    }
+    response = await client.post(
+        "/api/v1/login",
+        data=login_data,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def stub_analysis(monkeypatch):
+    async def fake_analyze_content(raw_text: str, owner_id=None):
+        return "A short summary.", Sentiment.POSITIVE
+
+    async def fake_analyze_many(texts, owner_id=None):
+        return [await fake_analyze_content(text, owner_id) for text in texts]
+
+    monkeypatch.setattr(api_v1, "analyze_content", fake_analyze_content)
+    monkeypatch.setattr(api_v1, "analyze_many", fake_analyze_many)
+    # The background job opens its own session, so point it at the test database
+    monkeypatch.setattr(api_v1, "AsyncSessionLocal", TestingSessionLocal)
+
+
+# --- 4. Test Cases ---
 
 
 @pytest.mark.asyncio
@@ -115,3 +162,550 @@ async def test_2_read_protected_content(client: AsyncClient):
     unauth_response = await client.get("/api/v1/contents")
     assert unauth_response.status_code == 401
     assert unauth_response.json()["detail"] == "Not authenticated"
+
+    wrong_scheme_response = await client.get(
+        "/api/v1/contents", headers={"Authorization": f"Basic {token}"}
+    )
+    assert wrong_scheme_response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_3_duplicate_signup_rejected(client: AsyncClient):
+    signup_data = {
+        "email": "testuser@pytest.com",
+        "password": "AnotherPassword456",
+    }
+    response = await client.post("/api/v1/signup", json=signup_data)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered."
+
+
+@pytest.mark.asyncio
+async def test_4_create_content_analyzes_in_background(client: AsyncClient, stub_analysis):
+    headers = await get_auth_headers(client)
+    response = await client.post(
+        "/api/v1/contents",
+        json={"raw_content": "This is a wonderful piece of content."},
+        headers=headers,
+    )
+
+    assert response.status_code == 202
+    assert response.json()["summary"] is None
+
+    content_id = response.json()["id"]
+    read_response = await client.get(f"/api/v1/contents/{content_id}", headers=headers)
+
+    assert read_response.status_code == 200
+    assert read_response.json()["summary"] == "A short summary."
+    assert read_response.json()["sentiment"] == "Positive"
+
+
+@pytest.mark.asyncio
+async def test_5_list_contents_paginates_newest_first(client: AsyncClient, stub_analysis):
+    headers = await get_auth_headers(client)
+    for i in range(3):
+        await client.post(
+            "/api/v1/contents",
+            json={"raw_content": f"Paginated content number {i}."},
+            headers=headers,
+        )
+
+    first_page = await client.get("/api/v1/contents", params={"limit": 2}, headers=headers)
+    assert first_page.status_code == 200
+    first_ids = [item["id"] for item in first_page.json()]
+    assert len(first_ids) == 2
+    assert first_ids == sorted(first_ids, reverse=True)
+    assert "raw_content" not in first_page.json()[0]
+
+    second_page = await client.get(
+        "/api/v1/contents",
+        params={"limit": 2, "after_id": first_ids[-1]},
+        headers=headers,
+    )
+    second_ids = [item["id"] for item in second_page.json()]
+    assert second_ids
+    assert max(second_ids) < min(first_ids)
+
+
+@pytest.mark.asyncio
+async def test_6_delete_content(client: AsyncClient, stub_analysis):
+    headers = await get_auth_headers(client)
+    response = await client.post(
+        "/api/v1/contents",
+        json={"raw_content": "Content that is about to be deleted."},
+        headers=headers,
+    )
+    content_id = response.json()["id"]
+
+    delete_response = await client.delete(f"/api/v1/contents/{content_id}", headers=headers)
+    assert delete_response.status_code == 204
+
+    missing_response = await client.delete(f"/api/v1/contents/{content_id}", headers=headers)
+    assert missing_response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_7_list_contents_etag_not_modified(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    response = await client.get("/api/v1/contents", headers=headers)
+
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    cached_response = await client.get(
+        "/api/v1/contents",
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert cached_response.status_code == 304
+    assert cached_response.content == b""
+    assert cached_response.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_8_email_is_case_insensitive(client: AsyncClient):
+    signup_data = {
+        "email": "MixedCase@PyTest.com",
+        "password": "TestPassword123",
+    }
+    response = await client.post("/api/v1/signup", json=signup_data)
+
+    assert response.status_code == 201
+    assert response.json()["email"] == "mixedcase@pytest.com"
+
+    login_data = {
+        "username": "MIXEDCASE@pytest.com",
+        "password": "TestPassword123",
+    }
+    response = await client.post(
+        "/api/v1/login",
+        data=login_data,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_9_repeat_analysis_is_served_from_cache(monkeypatch):
+    calls = []
+
+    async def fake_query_gemini(raw_text: str):
+        calls.append(raw_text)
+        return GeminiAnalysis(summary="Cached summary.", sentiment="NEGATIVE")
+
+    monkeypatch.setattr(llm_service, "query_gemini", fake_query_gemini)
+
+    first = await llm_service.analyze_content("Text that is analysed only once.")
+    second = await llm_service.analyze_content("Text that is analysed only once.")
+
+    assert first == second == ("Cached summary.", Sentiment.NEGATIVE)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_10_concurrent_duplicate_analyses_share_one_call(monkeypatch):
+    calls = []
+
+    async def fake_query_gemini(raw_text: str):
+        calls.append(raw_text)
+        await asyncio.sleep(0.01)
+        return GeminiAnalysis(summary="Shared summary.", sentiment="NEUTRAL")
+
+    monkeypatch.setattr(llm_service, "query_gemini", fake_query_gemini)
+
+    results = await asyncio.gather(
+        *(llm_service.analyze_content("Text submitted twice at once.") for _ in range(3))
+    )
+
+    assert all(result == ("Shared summary.", Sentiment.NEUTRAL) for result in results)
+    assert len(calls) == 1
+
+
+def test_11_gemini_envelope_parses_structured_output():
+    envelope = (
+        b'{"candidates": [{"content": {"parts": [{"text": '
+        b'"{\\"summary\\": \\"Fine.\\", \\"sentiment\\": \\"positive\\"}"}]}}],'
+        b' "usageMetadata": {"totalTokenCount": 42}}'
+    )
+    json_text = GeminiResponse.model_validate_json(envelope).first_text()
+    analysis = GeminiAnalysis.model_validate_json(json_text)
+
+    assert analysis.summary == "Fine."
+    assert analysis.sentiment is Sentiment.POSITIVE
+    assert GeminiResponse.model_validate_json(b"{}").first_text() is None
+
+    with pytest.raises(ValidationError):
+        GeminiAnalysis.model_validate_json('{"summary": "", "sentiment": "ECSTATIC"}')
+
+
+@pytest.mark.asyncio
+async def test_12_bulk_create_contents(client: AsyncClient, stub_analysis):
+    headers = await get_auth_headers(client)
+    response = await client.post(
+        "/api/v1/contents/bulk",
+        json={"items": [{"raw_content": "First bulk item."}, {"raw_content": "Second bulk item."}]},
+        headers=headers,
+    )
+
+    assert response.status_code == 202
+    assert [item["raw_content"] for item in response.json()] == ["First bulk item.", "Second bulk item."]
+
+    for item in response.json():
+        read_response = await client.get(f"/api/v1/contents/{item['id']}", headers=headers)
+        assert read_response.json()["sentiment"] == "Positive"
+
+
+@pytest.mark.asyncio
+async def test_13_concurrent_analyses_are_batched(monkeypatch):
+    batches = []
+
+    async def fake_query_gemini_batch(raw_texts):
+        batches.append(raw_texts)
+        return [GeminiAnalysis(summary=f"Summary of {text}", sentiment="POSITIVE") for text in raw_texts]
+
+    monkeypatch.setattr(llm_service, "query_gemini_batch", fake_query_gemini_batch)
+
+    texts = ["The first text in the batch.", "The second text in the batch.", "The third text in the batch."]
+    results = await llm_service.analyze_many(texts, owner_id=1)
+
+    assert results == [(f"Summary of {text}", Sentiment.POSITIVE) for text in texts]
+    assert batches == [texts]
+
+
+@pytest.mark.asyncio
+async def test_14_short_input_skips_gemini(monkeypatch):
+    async def fail_query_gemini(raw_text: str):
+        raise AssertionError("Gemini should not be called for short input")
+
+    monkeypatch.setattr(llm_service, "query_gemini", fail_query_gemini)
+
+    assert await llm_service.analyze_content("  Hello!  ") == ("Hello!", Sentiment.NEUTRAL)
+    assert await llm_service.analyze_content("") == (None, Sentiment.NEUTRAL)
+
+
+@pytest.mark.asyncio
+async def test_15_rate_limited_gemini_call_is_retried(monkeypatch):
+    envelope = {
+        "candidates": [
+            {"content": {"parts": [{"text": '{"summary": "Retried.", "sentiment": "POSITIVE"}'}]}}
+        ]
+    }
+    statuses = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        statuses.append(429 if not statuses else 200)
+        if statuses[-1] == 429:
+            return httpx.Response(429, headers={"Retry-After": "0"}, text="slow down")
+        return httpx.Response(200, json=envelope)
+
+    mock_client = httpx.AsyncClient(
+        base_url=llm_service.GEMINI_BASE_URL, transport=httpx.MockTransport(handler)
+    )
+    monkeypatch.setattr(llm_service, "get_client", lambda: mock_client)
+
+    analysis = await llm_service.query_gemini("Some text that needs analysing.")
+
+    assert analysis == GeminiAnalysis(summary="Retried.", sentiment="POSITIVE")
+    assert statuses == [429, 200]
+    await mock_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_16_circuit_breaker_fails_fast_when_gemini_is_down(monkeypatch):
+    attempts = []
+
+    async def failing_post(content: bytes) -> bytes:
+        attempts.append(content)
+        raise httpx.ConnectError("Gemini is unreachable")
+
+    monkeypatch.setattr(llm_service, "_post_with_retries", failing_post)
+    monkeypatch.setattr(llm_service, "_breaker", llm_service._CircuitBreaker(fail_max=2, reset_seconds=60))
+
+    for _ in range(4):
+        assert await llm_service.query_gemini("Text sent while Gemini is down.") is None
+
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_17_batches_never_mix_owners(monkeypatch):
+    batches = []
+
+    async def fake_query_gemini_batch(raw_texts):
+        batches.append(sorted(raw_texts))
+        return [GeminiAnalysis(summary="Batched.", sentiment="NEUTRAL") for _ in raw_texts]
+
+    async def fake_query_gemini(raw_text: str):
+        batches.append([raw_text])
+        return GeminiAnalysis(summary="Alone.", sentiment="NEUTRAL")
+
+    monkeypatch.setattr(llm_service, "query_gemini_batch", fake_query_gemini_batch)
+    monkeypatch.setattr(llm_service, "query_gemini", fake_query_gemini)
+
+    await asyncio.gather(
+        llm_service.analyze_content("Owner one writes the first text.", owner_id=101),
+        llm_service.analyze_content("Owner two writes the first text.", owner_id=102),
+        llm_service.analyze_content("Owner one writes the second text.", owner_id=101),
+        llm_service.analyze_content("Owner two writes the second text.", owner_id=102),
+    )
+
+    assert sorted(batches) == [
+        ["Owner one writes the first text.", "Owner one writes the second text."],
+        ["Owner two writes the first text.", "Owner two writes the second text."],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_18_batch_results_are_matched_by_index(monkeypatch):
+    def envelope(items):
+        text = json.dumps(items)
+        return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+    answers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=envelope(answers.pop(0)))
+
+    mock_client = httpx.AsyncClient(
+        base_url=llm_service.GEMINI_BASE_URL, transport=httpx.MockTransport(handler)
+    )
+    monkeypatch.setattr(llm_service, "get_client", lambda: mock_client)
+
+    # Out of order: mapped back by index
+    answers.append([
+        {"index": 1, "summary": "Second.", "sentiment": "NEGATIVE"},
+        {"index": 0, "summary": "First.", "sentiment": "POSITIVE"},
+    ])
+    analyses = await llm_service.query_gemini_batch(["first text", "second text"])
+    assert [analysis.summary for analysis in analyses] == ["First.", "Second."]
+
+    # Right count, but a duplicated index: the whole batch is rejected
+    answers.append([
+        {"index": 0, "summary": "First.", "sentiment": "POSITIVE"},
+        {"index": 0, "summary": "Merged.", "sentiment": "POSITIVE"},
+    ])
+    assert await llm_service.query_gemini_batch(["first text", "second text"]) is None
+
+    # An index missing: rejected as well
+    answers.append([{"index": 1, "summary": "Second.", "sentiment": "NEGATIVE"}])
+    assert await llm_service.query_gemini_batch(["first text", "second text"]) is None
+    await mock_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_19_close_client_stops_the_batcher():
+    llm_service._get_batch_queue()
+    collector = llm_service._batch_collector
+
+    await llm_service.close_client()
+
+    assert collector.cancelled()
+    assert llm_service._batch_collector is None
+
+
+@pytest.mark.asyncio
+async def test_20_legacy_sha256_crypt_login_is_upgraded_to_argon2(client: AsyncClient):
+    async with TestingSessionLocal() as session:
+        session.add(User(
+            email="legacy@pytest.com",
+            hashed_password=sha256_crypt.using(rounds=1000).hash("LegacyPassword123"),
+            is_active=True,
+        ))
+        await session.commit()
+
+    login_data = {"username": "legacy@pytest.com", "password": "LegacyPassword123"}
+    form_headers = {"Content-Type": "application/x-www-form-urlencoded"}
+
+    wrong = await client.post("/api/v1/login", data={**login_data, "password": "nope"}, headers=form_headers)
+    assert wrong.status_code == 401
+
+    response = await client.post("/api/v1/login", data=login_data, headers=form_headers)
+    assert response.status_code == 200
+
+    async with TestingSessionLocal() as session:
+        stored_hash = await session.scalar(
+            select(User.hashed_password).where(User.email == "legacy@pytest.com")
+        )
+    assert stored_hash.startswith("$argon2id$")
+
+    # The upgraded hash keeps working
+    response = await client.post("/api/v1/login", data=login_data, headers=form_headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_21_cancelled_single_flight_owner_does_not_cancel_waiters(monkeypatch):
+    started = asyncio.Event()
+
+    async def slow_query_gemini(raw_text: str):
+        started.set()
+        await asyncio.sleep(10)
+        return GeminiAnalysis(summary="Too late.", sentiment="NEUTRAL")
+
+    monkeypatch.setattr(llm_service, "query_gemini", slow_query_gemini)
+
+    text = "Text whose first requester gives up."
+    owner = asyncio.create_task(llm_service.analyze_content(text))
+    await started.wait()
+    waiter = asyncio.create_task(llm_service.analyze_content(text))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+
+    assert await waiter == (None, None)
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    assert not llm_service._inflight
+    # Don't leave the abandoned Gemini call running after the test
+    await llm_service._stop_batcher()
+
+
+async def get_test_user() -> User:
+    async with TestingSessionLocal() as session:
+        return await session.scalar(select(User).where(User.email == "testuser@pytest.com"))
+
+
+@pytest.mark.asyncio
+async def test_22_token_without_user_claims_is_rejected(client: AsyncClient):
+    user = await get_test_user()
+    token = create_access_token(data={"sub": str(user.id)})
+
+    response = await client.get("/api/v1/contents", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_23_revoked_token_is_rejected_even_when_cached(client: AsyncClient):
+    headers = await get_auth_headers(client)
+    token = headers["Authorization"].removeprefix("Bearer ")
+
+    assert (await client.get("/api/v1/contents", headers=headers)).status_code == 200
+    assert deps._token_hash(token) in deps.get_current_user._cache
+
+    deps.invalidate_token(token)
+
+    response = await client.get("/api/v1/contents", headers=headers)
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_24_cached_token_is_not_served_after_exp(client: AsyncClient):
+    user = await get_test_user()
+    token = create_access_token(
+        data={"sub": str(user.id), "email": user.email, "act": True},
+        expires_delta=timedelta(seconds=-5),
+    )
+    # Plant a cache entry for the token whose exp has already passed
+    token_hash = deps._token_hash(token)
+    deps.get_current_user._cache[token_hash] = (User(id=user.id, email=user.email, is_active=True), 0)
+
+    response = await client.get("/api/v1/contents", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 401
+    assert token_hash not in deps.get_current_user._cache
+
+
+@pytest.mark.asyncio
+async def test_25_inactive_token_is_rejected(client: AsyncClient):
+    user = await get_test_user()
+    token = create_access_token(data={"sub": str(user.id), "email": user.email, "act": False})
+
+    response = await client.get("/api/v1/contents", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+
+@pytest.mark.asyncio
+async def test_26_current_user_from_db(client: AsyncClient):
+    user = await get_test_user()
+    claims = {"sub": str(user.id), "email": user.email, "act": True}
+    # A lifetime no other test uses, so this token can't collide with one revoked earlier
+    token = create_access_token(data=claims, expires_delta=timedelta(minutes=17))
+
+    async with TestingSessionLocal() as session:
+        loaded = await deps.get_current_user_from_db(db=session, token=token)
+        assert loaded.id == user.id
+
+        revoked_token = create_access_token(data=claims, expires_delta=timedelta(minutes=5))
+        deps.invalidate_token(revoked_token)
+        with pytest.raises(HTTPException) as exc_info:
+            await deps.get_current_user_from_db(db=session, token=revoked_token)
+        assert exc_info.value.status_code == 401
+
+        unknown_token = create_access_token(data={**claims, "sub": "999999"})
+        with pytest.raises(HTTPException) as exc_info:
+            await deps.get_current_user_from_db(db=session, token=unknown_token)
+        assert exc_info.value.status_code == 401
+
+        # Deactivation in the database takes effect even though the token says active
+        loaded.is_active = False
+        await session.commit()
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                await deps.get_current_user_from_db(db=session, token=token)
+            assert exc_info.value.status_code == 400
+        finally:
+            loaded.is_active = True
+            await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_27_bulk_write_back_skips_items_deleted_meanwhile(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(api_v1, "AsyncSessionLocal", TestingSessionLocal)
+    user = await get_test_user()
+    # A lifetime no other test uses, so this token can't collide with one revoked earlier
+    token = create_access_token(
+        data={"sub": str(user.id), "email": user.email, "act": True},
+        expires_delta=timedelta(minutes=19),
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Hold the background job back so an item can be deleted before it writes results
+    async def no_analysis_yet(texts, owner_id=None):
+        return [(None, None) for _ in texts]
+
+    monkeypatch.setattr(api_v1, "analyze_many", no_analysis_yet)
+    response = await client.post(
+        "/api/v1/contents/bulk",
+        json={"items": [{"raw_content": "Bulk item that stays."}, {"raw_content": "Bulk item that goes."}]},
+        headers=headers,
+    )
+    kept, deleted = response.json()
+    await client.delete(f"/api/v1/contents/{deleted['id']}", headers=headers)
+
+    async def fake_analyze_many(texts, owner_id=None):
+        return [("A short summary.", Sentiment.POSITIVE) for _ in texts]
+
+    monkeypatch.setattr(api_v1, "analyze_many", fake_analyze_many)
+    await api_v1._run_bulk_analysis_and_persist(
+        kept["owner_id"], [(kept["id"], kept["raw_content"]), (deleted["id"], deleted["raw_content"])]
+    )
+
+    read_response = await client.get(f"/api/v1/contents/{kept['id']}", headers=headers)
+    assert read_response.json()["summary"] == "A short summary."
+
+
+@pytest.mark.asyncio
+async def test_28_revocations_are_only_dropped_after_exp(client: AsyncClient, monkeypatch):
+    user = await get_test_user()
+    token = create_access_token(
+        data={"sub": str(user.id), "email": user.email, "act": True},
+        expires_delta=timedelta(minutes=23),
+    )
+    deps.invalidate_token(token)
+
+    # Far more revocations than the old size cap held; none may push the first one out
+    later = time.time() + 3600
+    monkeypatch.setattr(
+        deps, "_revoked_tokens", {**deps._revoked_tokens, **{i.to_bytes(16, "big"): later for i in range(20000)}}
+    )
+    deps.invalidate_token("not-a-jwt")
+    assert deps._is_revoked(deps._token_hash(token))
+
+    response = await client.get("/api/v1/contents", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+    # Entries past their exp are purged on the next revocation
+    deps._revoked_tokens[b"expired"] = time.time() - 1
+    deps.invalidate_token("another-not-a-jwt")
+    assert b"expired" not in deps._revoked_tokens